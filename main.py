@@ -1,7 +1,7 @@
 import os
 import json
 import pandas as pd
-from src.conexion import extraer_datos, guardar_json, TAG_MAPPING
+from src.conexion import extraer_datos, guardar_json, listar_fuentes, TAG_MAPPING
 from src.reportes_excel import generar_reporte_excel
 
 WORK_MODE = 'online'
@@ -17,8 +17,16 @@ def safe_pivot(df, index, columns, values):
     piv = df.pivot_table(index=index, columns=columns, values=values)
     return piv.reset_index() if index in piv.index.names else piv
 
+def calificar_tags(df, multi_fuente):
+    # Con varias fuentes configuradas, un mismo TagName puede venir de dos sitios: se separa
+    # por Source siempre, aunque en este periodo solo haya respondido una de ellas
+    if multi_fuente and 'Source' in df:
+        df['TagName'] = df['Source'] + '/' + df['TagName']
+    return df
+
 def main():
     os.makedirs(DATA_DIR, exist_ok=True)
+    multi_fuente = len(listar_fuentes()) > 1
 
     # 1) Extraer + JSON
     if WORK_MODE == 'online':
@@ -43,6 +51,7 @@ def main():
             for df in (df_d, df_h):
                 if 'Timestamp' in df:
                     df['Timestamp'] = pd.to_datetime(df['Timestamp'])
+                calificar_tags(df, multi_fuente)
 
             # Para cada tipo de agrupación...
             for kind, mapping in (("Plant", TAG_MAPPING['plants']),
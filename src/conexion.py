@@ -1,9 +1,11 @@
 import os
 import json
+import math
 import time
+import queue
 import logging
+import threading
 import configparser
-import pyodbc
 import pandas as pd
 from datetime import datetime, timedelta, timezone
 
@@ -24,9 +26,81 @@ def leer_config():
     cfg.read(os.path.join(os.path.dirname(__file__), '..', 'config', 'config.ini'))
     return cfg
 
-def conectar_bd(retries=3, backoff=1.5):
-    cfg      = leer_config()
-    db       = cfg['DATABASE']
+# Secciones [DATABASE] (fuente por defecto) y [DATABASE:<nombre>] (fuentes adicionales)
+SECCION_BD     = 'DATABASE'
+PREFIJO_BD     = 'DATABASE:'
+FUENTE_DEFECTO = 'default'
+
+# Semáforos por fuente: {nombre: (max_conexiones, semáforo)}
+_LIMITES     = {}
+_LIMITES_LCK = threading.Lock()
+
+# Errores que dejan fuera a una sola fuente; cualquier otro es un bug y se propaga.
+# pyodbc se importa al usarlo: sin el driver nativo el módulo sigue siendo importable.
+ERRORES_FUENTE = (ConnectionError, TimeoutError)
+
+def _errores_fuente():
+    try:
+        import pyodbc
+    except ImportError:
+        return ERRORES_FUENTE
+    return ERRORES_FUENTE + (pyodbc.OperationalError,)
+
+def listar_fuentes(cfg=None):
+    """Devuelve {nombre_fuente: sección} con todas las fuentes [DATABASE*] del config."""
+    cfg = leer_config() if cfg is None else cfg
+    fuentes = {}
+    for sec in cfg.sections():
+        if sec == SECCION_BD:
+            nombre = cfg[sec].get('name', FUENTE_DEFECTO).strip()
+        elif sec.startswith(PREFIJO_BD):
+            nombre = cfg[sec].get('name', sec[len(PREFIJO_BD):]).strip()
+        else:
+            continue
+        if not nombre:
+            raise ValueError(f"La sección [{sec}] no define un nombre de fuente")
+        if nombre in fuentes:
+            raise ValueError(f"Nombre de fuente duplicado '{nombre}' en [{sec}]")
+        fuentes[nombre] = cfg[sec]
+    if not fuentes:
+        raise KeyError("No hay ninguna sección [DATABASE] en config.ini")
+    return fuentes
+
+def _validar_fuente(nombre, db):
+    if db.getint('max_conexiones', 1) < 1:
+        raise ValueError(f"Fuente {nombre}: max_conexiones debe ser >= 1")
+    for clave in ('timeout', 'query_timeout', 'connect_timeout'):
+        if db.getint(clave, 0) < 0:
+            raise ValueError(f"Fuente {nombre}: {clave} no puede ser negativo")
+
+def _limite_fuente(nombre, maximo):
+    # Se recrea si cambia max_conexiones (el scanner vuelve a leer el config en cada ciclo)
+    with _LIMITES_LCK:
+        actual = _LIMITES.get(nombre)
+        if actual is None or actual[0] != maximo:
+            actual = _LIMITES[nombre] = (maximo, threading.BoundedSemaphore(maximo))
+        return actual[1]
+
+def _restante(limite_hasta):
+    """Segundos que quedan hasta `limite_hasta` (time.monotonic) o None si no hay plazo."""
+    if limite_hasta is None:
+        return None
+    resto = limite_hasta - time.monotonic()
+    if resto <= 0:
+        raise TimeoutError("Plazo de la fuente agotado")
+    return resto
+
+def _acotar(segundos, limite_hasta):
+    # 0 = sin límite en pyodbc; se acota por lo que queda del plazo de la fuente
+    resto = _restante(limite_hasta)
+    if resto is None:
+        return segundos
+    resto = max(1, math.ceil(resto))
+    return min(segundos, resto) if segundos else resto
+
+def conectar_bd(retries=3, backoff=1.5, db=None, limite_hasta=None):
+    import pyodbc
+    db       = db if db is not None else leer_config()[SECCION_BD]
     driver   = db['driver']
     server   = db['server']
     database = db['database']
@@ -40,13 +114,18 @@ def conectar_bd(retries=3, backoff=1.5):
 
     for i in range(retries):
         try:
-            conn = pyodbc.connect(conn_str, timeout=5)
-            logging.info("✅ Conexión ODBC exitosa (intento %d)", i+1)
+            conn = pyodbc.connect(conn_str, timeout=_acotar(db.getint('connect_timeout', 5), limite_hasta))
+            conn.timeout = _acotar(db.getint('query_timeout', 0), limite_hasta)
+            logging.info("✅ Conexión ODBC exitosa a %s (intento %d)", server, i+1)
             return conn
+        except TimeoutError:
+            raise
         except Exception as e:
-            logging.warning("❌ Error ODBC intento %d: %s", i+1, e)
-            time.sleep(backoff ** i)
-    raise ConnectionError("No se pudo conectar a la base de datos tras varios intentos")
+            logging.warning("❌ Error ODBC %s intento %d: %s", server, i+1, e)
+            espera = backoff ** i
+            resto  = _restante(limite_hasta)
+            time.sleep(espera if resto is None else min(espera, resto))
+    raise ConnectionError(f"No se pudo conectar a la base de datos {server} tras varios intentos")
 
 def get_date_range(period="day"):
     now   = datetime.now(timezone.utc)
@@ -66,8 +145,12 @@ def get_date_range(period="day"):
         return start, start.replace(year=start.year+1)
     raise ValueError("Periodo no soportado")
 
-def extraer_datos(period="day"):
-    conn       = conectar_bd()
+def _extraer_fuente(period, db, nombre=FUENTE_DEFECTO, limite_hasta=None):
+    """
+    Lanza las consultas de `period` contra una fuente. Hasta `max_conexiones`
+    trabajadores (cada uno con su conexión) reparten las consultas; con el valor
+    por defecto (1) se ejecutan en serie sobre una única conexión.
+    """
     start, end = get_date_range(period)
     s0, e0     = start.isoformat(), end.isoformat()
 
@@ -78,8 +161,7 @@ def extraer_datos(period="day"):
         Tagname AS TagName
       FROM [IS].[VTagBrowsing];
     """
-    df_tags = pd.read_sql(q_tags, conn)
-    name_map = dict(zip(df_tags.TagUID, df_tags.TagName))
+    consultas = {'tags': (q_tags, None)}
 
     # 2) Consultas RAW (daily) + agregación hourly
     if period=="day":
@@ -92,7 +174,7 @@ def extraer_datos(period="day"):
           FROM TLG.VAggregateValue AV
           WHERE AV.TimeStamp >= ? AND AV.TimeStamp < ?;
         """
-        df = pd.read_sql(q_raw, conn, params=[s0, e0])
+        consultas['daily'] = (q_raw, [s0, e0])
 
         q_hour = """
           SELECT 
@@ -104,7 +186,7 @@ def extraer_datos(period="day"):
           WHERE TimeStamp >= ? AND TimeStamp < ?
           GROUP BY DATEADD(hour, DATEDIFF(hour,0,SWITCHOFFSET(TimeStamp,'+00:00')),0), TagUID;
         """
-        df_hourly = pd.read_sql(q_hour, conn, params=[s0, e0])
+        consultas['hourly'] = (q_hour, [s0, e0])
     else:
         q_agg = """
           SELECT 
@@ -116,11 +198,57 @@ def extraer_datos(period="day"):
           WHERE TimeStamp >= ? AND TimeStamp < ?
           GROUP BY CAST(SWITCHOFFSET(TimeStamp,'+00:00') AS date), TagUID;
         """
-        df        = pd.read_sql(q_agg, conn, params=[s0, e0])
-        df_hourly = pd.DataFrame(columns=['Date','TagUID','Value'])
+        consultas['daily'] = (q_agg, [s0, e0])
+
+    # 3) Repartir consultas entre trabajadores, limitados por el semáforo de la fuente
+    maximo     = db.getint('max_conexiones', 1)
+    sem        = _limite_fuente(nombre, maximo)
+    pendientes = queue.SimpleQueue()
+    for clave in consultas:
+        pendientes.put(clave)
+    resultados, errores = {}, []
+
+    def trabajador():
+        try:
+            if not sem.acquire(timeout=_restante(limite_hasta)):
+                raise TimeoutError(f"Fuente {nombre}: sin conexión libre antes del plazo")
+        except TimeoutError as e:
+            errores.append(e)
+            return
+        try:
+            conn = conectar_bd(db=db, limite_hasta=limite_hasta)
+            try:
+                while not errores:
+                    try:
+                        clave = pendientes.get_nowait()
+                    except queue.Empty:
+                        break
+                    sql, params = consultas[clave]
+                    conn.timeout = _acotar(db.getint('query_timeout', 0), limite_hasta)
+                    resultados[clave] = pd.read_sql(sql, conn, params=params)
+            finally:
+                conn.close()
+        except Exception as e:
+            errores.append(e)
+        finally:
+            sem.release()
 
-    conn.close()
+    hilos = [threading.Thread(target=trabajador, daemon=True, name=f"{nombre}-sql-{i}")
+             for i in range(min(maximo, len(consultas)))]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    if errores:
+        raise errores[0]
 
+    df_tags   = resultados['tags']
+    name_map  = dict(zip(df_tags.TagUID, df_tags.TagName))
+    df        = resultados['daily']
+    df_hourly = resultados.get('hourly', pd.DataFrame(columns=['Date','TagUID','Value']))
+    return df, df_hourly, name_map
+
+def _enriquecer(df, df_hourly, name_map):
     # Asegurar datetime
     if not df.empty:
         df['Date'] = pd.to_datetime(df['Date'])
@@ -146,7 +274,77 @@ def extraer_datos(period="day"):
 
         d.drop(columns=['Date'], inplace=True)
 
-    return {'daily': df, 'hourly': df_hourly}
+    return df, df_hourly
+
+def _es_fallo_fuente(exc):
+    # pandas envuelve los errores de pyodbc en DatabaseError: se revisa la cadena de causas
+    errores = _errores_fuente()
+    while exc is not None:
+        if isinstance(exc, errores):
+            return True
+        exc = exc.__cause__
+    return False
+
+def extraer_datos(period="day", fuentes=None):
+    """
+    Extrae `period` de todas las fuentes configuradas en paralelo y las une en un
+    único frame etiquetado con la columna Source. Una fuente que no conecta o agota
+    su `timeout` se registra y se omite; los demás errores se propagan. Si no
+    responde ninguna fuente se lanza ConnectionError.
+    """
+    fuentes = fuentes or listar_fuentes()
+    cols    = ['Value', 'TagName', 'Timestamp', 'Plant', 'Basin', 'Source']
+    for nombre, db in fuentes.items():
+        _validar_fuente(nombre, db)
+
+    inicio     = time.monotonic()
+    plazos     = {n: (inicio + db.getint('timeout', 0) if db.getint('timeout', 0) else None)
+                  for n, db in fuentes.items()}
+    resultados = {}
+
+    def tarea(nombre, db):
+        try:
+            df, df_hourly, name_map = _extraer_fuente(period, db, nombre, plazos[nombre])
+            df, df_hourly = _enriquecer(df, df_hourly, name_map)
+            for d in (df, df_hourly):
+                d['Source'] = nombre
+            resultados[nombre] = (df, df_hourly), None
+        except Exception as e:
+            resultados[nombre] = None, e
+
+    # Hilos daemon: una fuente colgada no impide que el proceso termine
+    hilos = {n: threading.Thread(target=tarea, args=(n, db), daemon=True, name=f"fuente-{n}")
+             for n, db in fuentes.items()}
+    for h in hilos.values():
+        h.start()
+
+    diarios, horarios, ultimo_error = [], [], None
+    for nombre, hilo in hilos.items():
+        limite_hasta = plazos[nombre]
+        hilo.join(None if limite_hasta is None else max(limite_hasta - time.monotonic(), 0))
+        if nombre not in resultados:
+            logging.warning("⏱ Fuente %s sin respuesta tras %ds, se omite (%s)",
+                            nombre, fuentes[nombre].getint('timeout'), period)
+            ultimo_error = TimeoutError(f"Fuente {nombre} superó su timeout")
+            continue
+        datos, error = resultados[nombre]
+        if error is not None:
+            if not _es_fallo_fuente(error):
+                raise error
+            logging.warning("❌ Fuente %s falló (%s): %s", nombre, period, error, exc_info=error)
+            ultimo_error = error
+            continue
+        diarios.append(datos[0])
+        horarios.append(datos[1])
+
+    if not diarios:
+        raise ConnectionError(f"Ninguna fuente de datos respondió para el periodo '{period}'") from ultimo_error
+
+    def unir(frames):
+        frames = [d for d in frames if not d.empty]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=cols)
+
+    return {'daily': unir(diarios), 'hourly': unir(horarios)}
 
 def guardar_json(resultados, filename='tags_data.json'):
     path = os.path.join(os.path.dirname(__file__), '..', 'data', filename)
@@ -164,6 +362,8 @@ def guardar_json(resultados, filename='tags_data.json'):
                     'TagName': rec['TagName'],
                     'Timestamp': rec['Timestamp']
                 }
+                if rec.get('Source'):
+                    base['Source'] = rec['Source']
                 if rec.get('Plant'):
                     base['Plant'] = rec['Plant']
                 elif rec.get('Basin'):
@@ -0,0 +1,227 @@
+import sys
+import time
+import types
+import threading
+import configparser
+import pytest
+import pandas as pd
+from src import conexion
+
+def fuentes(texto):
+    cfg = configparser.ConfigParser()
+    cfg.read_string(texto)
+    return conexion.listar_fuentes(cfg)
+
+def crudo(tag_uid='u1', tag_name='EA_X'):
+    df = pd.DataFrame({'Date': ['2025-01-01 00:00:00'], 'TagUID': [tag_uid], 'Value': [1.0]})
+    return df, df.copy(), {tag_uid: tag_name}
+
+def vacio():
+    df = pd.DataFrame(columns=['Date', 'TagUID', 'Value'])
+    return df, df.copy(), {}
+
+CONFIG = """
+[DATABASE]
+server = a
+[DATABASE:norte]
+server = b
+timeout = 1
+"""
+
+def test_fuente_caida_se_omite(monkeypatch):
+    def falso(period, db, nombre, limite_hasta):
+        if nombre == 'norte':
+            raise ConnectionError("sin red")
+        return crudo()
+    monkeypatch.setattr(conexion, '_extraer_fuente', falso)
+    res = conexion.extraer_datos('day', fuentes(CONFIG))
+    assert set(res['daily']['Source']) == {'default'}
+    assert set(res['hourly']['Source']) == {'default'}
+
+def test_fuente_lenta_se_omite_por_timeout(monkeypatch):
+    def falso(period, db, nombre, limite_hasta):
+        if nombre == 'norte':
+            time.sleep(3)
+        return crudo()
+    monkeypatch.setattr(conexion, '_extraer_fuente', falso)
+    t0 = time.monotonic()
+    res = conexion.extraer_datos('day', fuentes(CONFIG))
+    assert time.monotonic() - t0 < 2
+    assert set(res['daily']['Source']) == {'default'}
+
+def test_todas_las_fuentes_fallan(monkeypatch):
+    def falso(period, db, nombre, limite_hasta):
+        raise ConnectionError("sin red")
+    monkeypatch.setattr(conexion, '_extraer_fuente', falso)
+    with pytest.raises(ConnectionError) as exc:
+        conexion.extraer_datos('day', fuentes(CONFIG))
+    assert isinstance(exc.value.__cause__, ConnectionError)
+
+def test_error_de_programacion_se_propaga(monkeypatch):
+    def falso(period, db, nombre, limite_hasta):
+        if nombre == 'norte':
+            raise KeyError('TagUID')
+        return crudo()
+    monkeypatch.setattr(conexion, '_extraer_fuente', falso)
+    with pytest.raises(KeyError):
+        conexion.extraer_datos('day', fuentes(CONFIG))
+
+def test_fuentes_vacias_devuelven_columnas(monkeypatch):
+    monkeypatch.setattr(conexion, '_extraer_fuente', lambda *a: vacio())
+    res = conexion.extraer_datos('day', fuentes(CONFIG))
+    for d in res.values():
+        assert d.empty
+        assert list(d.columns) == ['Value', 'TagName', 'Timestamp', 'Plant', 'Basin', 'Source']
+
+def test_nombres_duplicados_o_vacios():
+    with pytest.raises(ValueError):
+        fuentes("[DATABASE]\nserver = a\n[DATABASE:default]\nserver = b\n")
+    with pytest.raises(ValueError):
+        fuentes("[DATABASE:a]\nserver = a\nname = x\n[DATABASE:b]\nserver = b\nname = x\n")
+    with pytest.raises(ValueError):
+        fuentes("[DATABASE:]\nserver = a\n")
+
+def test_max_conexiones_invalido(monkeypatch):
+    monkeypatch.setattr(conexion, '_extraer_fuente', lambda *a: crudo())
+    with pytest.raises(ValueError):
+        conexion.extraer_datos('day', fuentes("[DATABASE]\nserver = a\nmax_conexiones = 0\n"))
+
+# --- Trabajadores de _extraer_fuente (conectar_bd y pd.read_sql simulados) ---
+
+class ConexionFalsa:
+    def __init__(self, registro):
+        self.timeout  = 0
+        self.registro = registro
+
+    def close(self):
+        with self.registro['lock']:
+            self.registro['abiertas'] -= 1
+
+@pytest.fixture
+def bd_falsa(monkeypatch):
+    """Simula conexiones y consultas; anota qué consulta corre en qué conexión."""
+    registro = {'lock': threading.Lock(), 'abiertas': 0, 'pico': 0,
+                'consultas': [], 'timeouts': [], 'espera': 0.2, 'falla': None}
+
+    def conectar(db=None, limite_hasta=None):
+        with registro['lock']:
+            registro['abiertas'] += 1
+            registro['pico'] = max(registro['pico'], registro['abiertas'])
+        return ConexionFalsa(registro)
+
+    def leer(sql, conn, params=None):
+        clave = ('tags' if 'VTagBrowsing' in sql else
+                 'hourly' if 'DATEADD(hour' in sql else 'daily')
+        registro['consultas'].append((clave, id(conn)))
+        registro['timeouts'].append(conn.timeout)
+        if clave == registro['falla']:
+            raise ValueError(f"fallo en {clave}")
+        time.sleep(registro['espera'])
+        if clave == 'tags':
+            return pd.DataFrame({'TagUID': ['u1'], 'TagName': ['EA_X']})
+        return pd.DataFrame({'Date': ['2025-01-01 00:00:00'], 'TagUID': ['u1'], 'Value': [1.0]})
+
+    monkeypatch.setattr(conexion, 'conectar_bd', conectar)
+    monkeypatch.setattr(conexion.pd, 'read_sql', leer)
+    return registro
+
+def seccion(texto):
+    cfg = configparser.ConfigParser()
+    cfg.read_string("[DATABASE]\nserver = a\ndatabase = b\ndriver = d\n" + texto)
+    return cfg['DATABASE']
+
+def test_una_conexion_ejecuta_en_serie(bd_falsa):
+    t0 = time.monotonic()
+    df, df_hourly, name_map = conexion._extraer_fuente('day', seccion("max_conexiones = 1\n"), 'serie')
+    assert time.monotonic() - t0 >= 0.6
+    assert bd_falsa['pico'] == 1
+    assert len({conn for _, conn in bd_falsa['consultas']}) == 1
+    assert [c for c, _ in bd_falsa['consultas']] == ['tags', 'daily', 'hourly']
+    assert name_map == {'u1': 'EA_X'} and len(df) == 1 and len(df_hourly) == 1
+
+def test_varias_conexiones_ejecutan_en_paralelo(bd_falsa):
+    t0 = time.monotonic()
+    conexion._extraer_fuente('day', seccion("max_conexiones = 2\n"), 'paralelo')
+    assert time.monotonic() - t0 < 0.55
+    assert bd_falsa['pico'] == 2
+    assert len({conn for _, conn in bd_falsa['consultas']}) == 2
+    assert sorted(c for c, _ in bd_falsa['consultas']) == ['daily', 'hourly', 'tags']
+
+def test_error_de_un_trabajador_detiene_al_resto(bd_falsa):
+    bd_falsa['falla'] = 'daily'
+    with pytest.raises(ValueError, match='daily'):
+        conexion._extraer_fuente('day', seccion("max_conexiones = 2\n"), 'error')
+    assert 'hourly' not in [c for c, _ in bd_falsa['consultas']]
+    assert bd_falsa['abiertas'] == 0
+
+def test_plazo_agotado_esperando_semaforo(bd_falsa):
+    sem = conexion._limite_fuente('ocupada', 1)
+    sem.acquire()
+    try:
+        with pytest.raises(TimeoutError):
+            conexion._extraer_fuente('day', seccion("max_conexiones = 1\n"), 'ocupada',
+                                     time.monotonic() + 0.2)
+    finally:
+        sem.release()
+    assert bd_falsa['consultas'] == []
+
+def test_plazo_agotado_entre_consultas(bd_falsa):
+    bd_falsa['espera'] = 0.3
+    with pytest.raises(TimeoutError):
+        conexion._extraer_fuente('day', seccion("max_conexiones = 1\n"), 'lenta',
+                                 time.monotonic() + 0.4)
+    assert [c for c, _ in bd_falsa['consultas']] == ['tags', 'daily']
+
+def test_timeout_de_consulta_acotado_por_el_plazo(bd_falsa):
+    bd_falsa['espera'] = 0
+    conexion._extraer_fuente('day', seccion("query_timeout = 300\n"), 'plazo',
+                             time.monotonic() + 5)
+    assert all(1 <= t <= 5 for t in bd_falsa['timeouts'])
+
+    bd_falsa['timeouts'].clear()
+    conexion._extraer_fuente('day', seccion("query_timeout = 2\n"), 'plazo', time.monotonic() + 5)
+    assert bd_falsa['timeouts'] == [2, 2, 2]
+
+    bd_falsa['timeouts'].clear()
+    conexion._extraer_fuente('day', seccion("query_timeout = 300\n"), 'plazo')
+    assert bd_falsa['timeouts'] == [300, 300, 300]
+
+# --- conectar_bd con un pyodbc simulado ---
+
+@pytest.fixture
+def pyodbc_falso(monkeypatch):
+    class OperationalError(Exception):
+        pass
+    modulo = types.SimpleNamespace(OperationalError=OperationalError, intentos=[])
+    monkeypatch.setitem(sys.modules, 'pyodbc', modulo)
+    return modulo
+
+def test_conectar_acota_timeouts_al_plazo(pyodbc_falso):
+    def conectar(conn_str, timeout):
+        pyodbc_falso.intentos.append(timeout)
+        return types.SimpleNamespace(timeout=0)
+    pyodbc_falso.connect = conectar
+    conn = conexion.conectar_bd(db=seccion("connect_timeout = 5\nquery_timeout = 300\n"),
+                                limite_hasta=time.monotonic() + 2)
+    assert pyodbc_falso.intentos == [2]
+    assert conn.timeout == 2
+
+def test_conectar_deja_de_reintentar_al_agotar_el_plazo(pyodbc_falso):
+    def conectar(conn_str, timeout):
+        pyodbc_falso.intentos.append(timeout)
+        raise pyodbc_falso.OperationalError("sin red")
+    pyodbc_falso.connect = conectar
+    t0 = time.monotonic()
+    with pytest.raises(TimeoutError):
+        conexion.conectar_bd(db=seccion(""), limite_hasta=time.monotonic() + 0.5)
+    assert time.monotonic() - t0 < 0.9
+    assert len(pyodbc_falso.intentos) == 1
+
+def test_error_operacional_de_pyodbc_omite_la_fuente(pyodbc_falso, monkeypatch):
+    def falso(period, db, nombre, limite_hasta):
+        if nombre == 'norte':
+            raise pd.errors.DatabaseError("consulta") from pyodbc_falso.OperationalError("HYT00")
+        return crudo()
+    monkeypatch.setattr(conexion, '_extraer_fuente', falso)
+    res = conexion.extraer_datos('day', fuentes(CONFIG))
+    assert set(res['daily']['Source']) == {'default'}
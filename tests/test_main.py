@@ -0,0 +1,33 @@
+import configparser
+import pandas as pd
+import main
+from src import conexion
+
+CONFIG = """
+[DATABASE]
+server = a
+[DATABASE:norte]
+server = b
+"""
+
+def test_tags_calificados_aunque_falle_una_fuente(monkeypatch):
+    cfg = configparser.ConfigParser()
+    cfg.read_string(CONFIG)
+    fuentes = conexion.listar_fuentes(cfg)
+
+    def falso(period, db, nombre, limite_hasta):
+        if nombre == 'norte':
+            raise ConnectionError("sin red")
+        df = pd.DataFrame({'Date': ['2025-01-01 00:00:00'], 'TagUID': ['u1'], 'Value': [1.0]})
+        return df, df.copy(), {'u1': 'EA_X'}
+    monkeypatch.setattr(conexion, '_extraer_fuente', falso)
+
+    df = conexion.extraer_datos('day', fuentes)['daily']
+    main.calificar_tags(df, len(fuentes) > 1)
+    piv = main.safe_pivot(df, 'Timestamp', 'TagName', 'Value')
+    assert 'default/EA_X' in piv.columns
+    assert 'EA_X' not in piv.columns
+
+def test_una_sola_fuente_no_califica():
+    df = pd.DataFrame({'TagName': ['EA_X'], 'Source': ['default']})
+    assert list(main.calificar_tags(df, False)['TagName']) == ['EA_X']